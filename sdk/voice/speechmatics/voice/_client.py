@@ -7,14 +7,20 @@ from __future__ import annotations
 import asyncio
 import datetime
 import os
-import re
+import sys
 import time
+from collections import deque
 from collections.abc import Awaitable
+from functools import lru_cache
+from itertools import count
 from typing import Any
 from typing import Callable
+from typing import Final
+from typing import Literal
 from typing import Optional
 from typing import Union
 from urllib.parse import parse_qs
+from urllib.parse import quote_plus
 from urllib.parse import urlencode
 from urllib.parse import urlparse
 from urllib.parse import urlunparse
@@ -33,6 +39,7 @@ from speechmatics.rt._exceptions import TransportError
 from . import __version__
 from ._audio import AudioBuffer
 from ._logging import get_logger
+from ._models import _ANNOTATION_FLAGS_BY_VALUE
 from ._models import AgentServerMessageType
 from ._models import AnnotationFlags
 from ._models import AnnotationResult
@@ -70,6 +77,79 @@ from ._vad import SILERO_INSTALL_HINT
 from ._vad import SileroVAD
 from ._vad import SileroVADResult
 
+# Endpoint query defaults (constant for the lifetime of the process)
+_DEFAULT_APP = f"voice-sdk/{__version__}"
+_SDK_QUERY = urlencode({"sm-voice-sdk": __version__})
+_DEFAULT_QUERY = urlencode({"sm-app": _DEFAULT_APP, "sm-voice-sdk": __version__})
+
+# Message types used on the per-event emit paths (bound once, avoiding enum attribute lookups)
+_ADD_SEGMENT: Final = AgentServerMessageType.ADD_SEGMENT
+_ADD_PARTIAL_SEGMENT: Final = AgentServerMessageType.ADD_PARTIAL_SEGMENT
+_SPEAKER_STARTED: Final = AgentServerMessageType.SPEAKER_STARTED
+_SPEAKER_ENDED: Final = AgentServerMessageType.SPEAKER_ENDED
+
+# Characters allowed in speakers to exclude from transcription
+_SPEAKER_BLOCK_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_")
+
+
+def _is_blocked_speaker(speaker: str) -> bool:
+    """Check for speakers to exclude from transcription (e.g. `__ASSISTANT__`).
+
+    Equivalent to matching `^__[A-Z0-9_]{2,}__$`, without the regex engine.
+
+    Args:
+        speaker: The speaker label.
+
+    Returns:
+        bool: True if the speaker should be excluded.
+    """
+    return (
+        len(speaker) >= 6
+        and speaker.startswith("__")
+        and speaker.endswith("__")
+        and _SPEAKER_BLOCK_CHARS.issuperset(speaker)
+    )
+
+
+@lru_cache(maxsize=32)
+def _build_endpoint_url(url: str, app: Optional[str] = None) -> str:
+    """Format the endpoint URL with the SDK and app versions (cached per URL and app).
+
+    Args:
+        url: The base URL for the endpoint.
+        app: The application name to use in the endpoint URL.
+
+    Returns:
+        str: The formatted endpoint URL.
+    """
+
+    # Query string for the two SDK params (app is the only part that varies)
+    sdk_query = f"sm-app={quote_plus(app)}&{_SDK_QUERY}" if app else _DEFAULT_QUERY
+
+    # No query or fragment, so append the query string without parsing the URL
+    if "?" not in url and "#" not in url:
+        return f"{url}?{sdk_query}"
+
+    # Parse the URL to extract existing query parameters
+    parsed = urlparse(url)
+
+    # No existing params, so use the query string directly
+    if not parsed.query:
+        return urlunparse(parsed._replace(query=sdk_query))
+
+    # Extract existing params into a dict of lists, keeping params without values
+    params = parse_qs(parsed.query, keep_blank_values=True)
+
+    # Use the provided app name, or fallback to existing value, or use the default string
+    existing_app = params.get("sm-app", [None])[0]
+    app_name = app or existing_app or _DEFAULT_APP
+    params["sm-app"] = [app_name]
+    params["sm-voice-sdk"] = [__version__]
+
+    # Re-encode the query string and reconstruct
+    updated_query = urlencode(params, doseq=True)
+    return urlunparse(parsed._replace(query=updated_query))
+
 
 class VoiceAgentClient(AsyncClient):
     """Voice Agent client.
@@ -237,11 +317,12 @@ class VoiceAgentClient(AsyncClient):
         # -------------------------------------
 
         self._trim_before_time: float = 0
-        self._fragment_idx: int = 0
+        self._next_fragment_id: Callable[[], int] = count(10, 10).__next__
         self._last_fragment_end_time: float = 0
-        self._speech_fragments: list[SpeechFragment] = []
-        self._speech_fragments_lock: asyncio.Lock = asyncio.Lock()
+        self._speech_fragments: deque[SpeechFragment] = deque()
         self._current_view: Optional[SpeakerSegmentView] = None
+        self._pending_partial_segments: Optional[list[SpeakerSegment]] = None
+        self._pending_partial_handle: Optional[asyncio.TimerHandle] = None
         self._previous_view: Optional[SpeakerSegmentView] = None
 
         # -------------------------------------
@@ -252,6 +333,10 @@ class VoiceAgentClient(AsyncClient):
         self._uses_silero_vad: bool = False
         self._silero_detector: Optional[SileroVAD] = None
 
+        # Audio queue for the VAD (processed by a single long-lived task)
+        self._vad_audio_queue: asyncio.Queue[bytes] = asyncio.Queue()
+        self._vad_queue_task: Optional[asyncio.Task] = None
+
         # Silero VAD detector
         if self._config.vad_config and self._config.vad_config.enabled:
             if not SileroVAD.dependencies_available():
@@ -333,11 +418,14 @@ class VoiceAgentClient(AsyncClient):
         # -------------------------------------
 
         self._session_speakers: dict[str, SessionSpeaker] = {}
+        self._speaker_status_payloads: dict[tuple[Optional[str], bool], dict[str, Any]] = {}
         self._is_speaking: bool = False
         self._current_speaker: Optional[str] = None
         self._last_valid_partial_word_count: int = 0
         self._dz_enabled: bool = self._config.enable_diarization
         self._dz_config = self._config.speaker_config
+        self._dz_focus_speakers: frozenset[str] = frozenset(map(sys.intern, self._dz_config.focus_speakers))
+        self._dz_ignore_speakers: frozenset[str] = frozenset(map(sys.intern, self._dz_config.ignore_speakers))
         self._last_speak_start_time: Optional[float] = None
         self._last_speak_end_time: Optional[float] = None
         self._last_speak_end_latency: float = 0
@@ -348,6 +436,8 @@ class VoiceAgentClient(AsyncClient):
 
         self._metrics_emitter_interval: float = 5.0
         self._metrics_emitter_task: Optional[asyncio.Task] = None
+        self._metrics_next_emission_time: float = 0.0
+        self._metrics_due_event: asyncio.Event = asyncio.Event()
 
         # -------------------------------------
         # Audio
@@ -359,6 +449,16 @@ class VoiceAgentClient(AsyncClient):
             AudioEncoding.PCM_F32LE: 4,
             AudioEncoding.PCM_S16LE: 2,
         }.get(self._audio_format.encoding, 1)
+        self._seconds_per_byte: float = 1.0 / (self._audio_sample_rate * self._audio_sample_width)
+
+        # Coalescing buffer for outgoing audio (disabled when size is zero)
+        self._send_buffer: bytearray = bytearray()
+        self._send_buffer_size: int = int(
+            self._audio_sample_rate * self._audio_sample_width * self._config.audio_coalesce_length
+        )
+        self._send_buffer_event: asyncio.Event = asyncio.Event()
+        self._send_buffer_lock: asyncio.Lock = asyncio.Lock()
+        self._send_buffer_task: Optional[asyncio.Task] = None
 
         # Default audio buffer
         if not self._config.audio_buffer_length and (self._uses_smart_turn or self._uses_silero_vad):
@@ -513,8 +613,12 @@ class VoiceAgentClient(AsyncClient):
         # Update the closing session flag
         self._closing_session = False
 
-        # Start the processor task
+        # Start the processor tasks
         self._stt_queue_task = asyncio.create_task(self._run_stt_queue())
+        if self._silero_detector:
+            self._start_vad_queue()
+        if self._send_buffer_size:
+            self._start_send_buffer_task()
 
         # Connect to API
         try:
@@ -525,7 +629,7 @@ class VoiceAgentClient(AsyncClient):
             self._is_connected = True
             self._start_metrics_task()
         except Exception as e:
-            self._logger.error(f"Exception: {e}")
+            self._logger.error("Exception: %s", e)
             raise
 
     async def __aenter__(self) -> VoiceAgentClient:
@@ -578,8 +682,13 @@ class VoiceAgentClient(AsyncClient):
             # Update the closing session flag
             self._closing_session = True
 
+            # Send any coalesced audio
+            self._stop_send_buffer_task()
+            await self._flush_send_buffer()
+
             # Emit final segments
             await self._emit_segments(finalize=True, is_eou=True)
+            self._cancel_pending_partial_segments()
 
             # Emit final metrics
             self._emit_speaker_metrics()
@@ -593,7 +702,7 @@ class VoiceAgentClient(AsyncClient):
             try:
                 await asyncio.wait_for(self.stop_session(), timeout=5.0)
             except Exception as e:
-                self._logger.error(f"Error closing session: {e}")
+                self._logger.error("Error closing session: %s", e)
             finally:
                 self._is_connected = False
 
@@ -609,6 +718,12 @@ class VoiceAgentClient(AsyncClient):
                 pass
             self._stt_queue_task = None
 
+        # Stop the VAD queue task
+        self._stop_vad_queue()
+
+        # Stop the send buffer task (also started when connect() fails)
+        self._stop_send_buffer_task()
+
     # ============================================================================
     # PUBLIC API METHODS
     # ============================================================================
@@ -645,31 +760,71 @@ class VoiceAgentClient(AsyncClient):
         if not self._is_ready_for_audio:
             return
 
-        # Send to the AsyncClient
+        # Send to the AsyncClient (batching small frames when coalescing is enabled)
+        if self._send_buffer_size:
+            if not self._send_buffer:
+                self._send_buffer_event.set()
+            self._send_buffer.extend(payload)
+            if len(self._send_buffer) >= self._send_buffer_size and not await self._flush_send_buffer():
+                await self.disconnect()
+                return
+        elif not await self._send_to_transport(payload):
+            await self.disconnect()
+            return
+
+        # Process with Silero VAD (only queued while the VAD task is running to consume it)
+        if self._vad_queue_task and not self._vad_queue_task.done():
+            self._vad_audio_queue.put_nowait(payload)
+
+        # Add to audio buffer (use put_bytes to handle variable chunk sizes)
+        if self._config.audio_buffer_length > 0:
+            await self._audio_buffer.put_bytes(payload)
+
+        # Calculate the time (in seconds) for the payload
+        payload_size = len(payload)
+        self._total_bytes += payload_size
+        self._total_time += payload_size * self._seconds_per_byte
+
+        # Wake the metrics emitter once the next emission is due
+        if self._total_time >= self._metrics_next_emission_time:
+            self._metrics_due_event.set()
+
+    async def _send_to_transport(self, payload: bytes) -> bool:
+        """Send audio to the AsyncClient.
+
+        Args:
+            payload: Audio data as bytes.
+
+        Returns:
+            bool: False if the transport failed and the connection should be closed.
+        """
         try:
             await super().send_audio(payload)
         except TransportError as e:
-            self._logger.warning(f"Error sending audio: {e}")
+            self._logger.warning("Error sending audio: %s", e)
             self._emit_message(
                 ErrorMessage(
                     reason="Transport error - connection being closed",
                 )
             )
-            await self.disconnect()
-            return
+            return False
+        return True
 
-        # Process with Silero VAD
-        if self._silero_detector:
-            asyncio.create_task(self._silero_detector.process_audio(payload))
+    async def _flush_send_buffer(self) -> bool:
+        """Send any coalesced audio as a single frame.
 
-        # Add to audio buffer (use put_bytes to handle variable chunk sizes)
-        if self._config.audio_buffer_length > 0:
-            await self._audio_buffer.put_bytes(payload)
+        Flushes from `send_audio`, the flush task and `disconnect` are serialised
+        by a lock, so coalesced audio is always sent in the order it arrived.
 
-        # Calculate the time (in seconds) for the payload
-        if self._audio_format is not None:
-            self._total_bytes += len(payload)
-            self._total_time += len(payload) / self._audio_sample_rate / self._audio_sample_width
+        Returns:
+            bool: False if the transport failed and the connection should be closed.
+        """
+        async with self._send_buffer_lock:
+            if not self._send_buffer:
+                return True
+            payload = bytes(self._send_buffer)
+            self._send_buffer.clear()
+            return await self._send_to_transport(payload)
 
     def update_diarization_config(self, config: SpeakerFocusConfig) -> None:
         """Update the diarization configuration.
@@ -678,6 +833,10 @@ class VoiceAgentClient(AsyncClient):
         a session. The new config will overwrite the existing configuration and become
         active immediately.
 
+        The speaker lists are read when the client is created and when this is
+        called, so this is the only supported way to change them. Editing the
+        lists of a config already passed to the client has no effect.
+
         Args:
             config: The new diarization configuration.
 
@@ -710,8 +869,10 @@ class VoiceAgentClient(AsyncClient):
         if not self._config.enable_diarization:
             raise ValueError("Diarization is not enabled")
 
-        # Update the diarization config
+        # Update the diarization config (with sets of interned IDs for speaker lookups)
         self._dz_config = config
+        self._dz_focus_speakers = frozenset(map(sys.intern, config.focus_speakers))
+        self._dz_ignore_speakers = frozenset(map(sys.intern, config.ignore_speakers))
 
     # ============================================================================
     # PUBLIC UTTERANCE / TURN MANAGEMENT
@@ -801,6 +962,19 @@ class VoiceAgentClient(AsyncClient):
 
                 self._stt_message_queue.put_nowait(_trigger_end_of_turn)
 
+    def _has_listeners(self, event: str) -> bool:
+        """Check if any handlers are registered for an event.
+
+        Unlike `listeners()`, this does not build lists of the registered handlers.
+
+        Args:
+            event: The event type.
+
+        Returns:
+            bool: True if there are persistent or one-time handlers for the event.
+        """
+        return bool(self._handlers.get(event) or self._once_handlers.get(event))
+
     def _emit_message(self, message: BaseMessage) -> None:
         """Emit a message to the client.
 
@@ -811,14 +985,29 @@ class VoiceAgentClient(AsyncClient):
             message: The BaseMessage class message to emit.
         """
 
+        # Skip serialising the message if no one is listening
+        if not self._has_listeners(message.message):
+            return
+
         # Forward to the emit() method
         self.emit(message.message, message.to_dict())
 
     def _emit_diagnostic_message(self, message: Union[str, dict[str, Any]]) -> None:
         """Emit a diagnostic message to the client."""
+
+        # Skip building the payload if no one is listening
+        if not self._has_listeners(AgentServerMessageType.DIAGNOSTICS):
+            return
+
+        # Build the payload in a single dict
+        payload: dict[str, Any] = {"message": AgentServerMessageType.DIAGNOSTICS.value}
         if isinstance(message, str):
-            message = {"msg": message}
-        self.emit(AgentServerMessageType.DIAGNOSTICS, {"message": AgentServerMessageType.DIAGNOSTICS.value, **message})
+            payload["msg"] = message
+        else:
+            payload.update(message)
+
+        # Emit the payload
+        self.emit(AgentServerMessageType.DIAGNOSTICS, payload)
 
     # ============================================================================
     # QUEUE PROCESSING
@@ -834,14 +1023,13 @@ class VoiceAgentClient(AsyncClient):
             try:
                 callback = await self._stt_message_queue.get()
 
-                if asyncio.iscoroutine(callback):
-                    await callback
-                elif asyncio.iscoroutinefunction(callback):
-                    await callback()
-                elif callable(callback):
+                # Callables first (the common case), awaiting any coroutine they return
+                if callable(callback):
                     result = callback()
                     if asyncio.iscoroutine(result):
                         await result
+                elif asyncio.iscoroutine(callback):
+                    await callback
 
             except asyncio.CancelledError:
                 self._logger.debug("STT queue task cancelled")
@@ -857,6 +1045,86 @@ class VoiceAgentClient(AsyncClient):
         if self._stt_queue_task:
             self._stt_queue_task.cancel()
 
+    def _start_vad_queue(self) -> None:
+        """Start the VAD audio queue."""
+        self._vad_queue_task = asyncio.create_task(self._run_vad_queue())
+
+    async def _run_vad_queue(self) -> None:
+        """Run the VAD audio queue.
+
+        A single task processes audio frames in order, rather than creating a new
+        task for every frame sent.
+        """
+        while True:
+            try:
+                payload = await self._vad_audio_queue.get()
+                if self._silero_detector:
+                    await self._silero_detector.process_audio(payload)
+
+            except asyncio.CancelledError:
+                self._logger.debug("VAD queue task cancelled")
+                return
+            except RuntimeError:
+                self._logger.debug("VAD queue event loop closed")
+                return
+            except Exception:
+                self._logger.warning("Exception in VAD audio queue", exc_info=True)
+
+    def _stop_vad_queue(self) -> None:
+        """Stop the VAD audio queue.
+
+        Any frames still queued are discarded, so they are not fed to the VAD at
+        the start of the next session.
+        """
+        if self._vad_queue_task:
+            self._vad_queue_task.cancel()
+            self._vad_queue_task = None
+        self._vad_audio_queue = asyncio.Queue()
+
+    def _start_send_buffer_task(self) -> None:
+        """Start the coalesced audio flush task."""
+        self._send_buffer_task = asyncio.create_task(self._run_send_buffer_task())
+
+    async def _run_send_buffer_task(self) -> None:
+        """Run the coalesced audio flush task.
+
+        Audio waiting in the coalescing buffer is sent after at most
+        `audio_coalesce_length` seconds, even if the buffer is not full.
+        """
+        while True:
+            try:
+                await self._send_buffer_event.wait()
+                self._send_buffer_event.clear()
+                await asyncio.sleep(self._config.audio_coalesce_length)
+
+                # Flush in its own (shielded) task, so stopping this task cannot drop the payload
+                is_sent = await asyncio.shield(self._flush_send_buffer())
+
+                # Close the connection on transport failure (as with send_audio)
+                if not is_sent:
+                    await self.disconnect()
+                    return
+
+            except asyncio.CancelledError:
+                self._logger.debug("Send buffer task cancelled")
+                return
+            except RuntimeError:
+                self._logger.debug("Send buffer event loop closed")
+                return
+            except Exception:
+                self._logger.warning("Exception in send buffer task", exc_info=True)
+
+    def _stop_send_buffer_task(self) -> None:
+        """Stop the coalesced audio flush task.
+
+        A flush already in progress still completes, holding the send buffer lock,
+        so a following `_flush_send_buffer` sends its audio after it.
+        """
+        # Cancel the task (unless it is disconnecting after a transport failure)
+        task, self._send_buffer_task = self._send_buffer_task, None
+        if task and task is not asyncio.current_task():
+            task.cancel()
+
     # ============================================================================
     # METRICS
     # ============================================================================
@@ -877,15 +1145,16 @@ class VoiceAgentClient(AsyncClient):
                 ) * self._metrics_emitter_interval
 
                 # Check if there are any listeners for AgentServerMessageType.METRICS
-                if not self.listeners(AgentServerMessageType.SESSION_METRICS):
+                if not self._has_listeners(AgentServerMessageType.SESSION_METRICS):
                     await asyncio.sleep(self._metrics_emitter_interval)
                     last_emission_time = self._total_time
                     continue
 
-                # Wait until we've actually reached that time
+                # Wait until we've actually reached that time (woken by `send_audio`, so no polling when idle)
+                self._metrics_next_emission_time = next_emission_time
                 while self._total_time < next_emission_time:
-                    time_to_wait = next_emission_time - self._total_time
-                    await asyncio.sleep(min(0.25, time_to_wait))
+                    self._metrics_due_event.clear()
+                    await self._metrics_due_event.wait()
 
                 # Update tracker
                 last_emission_time = self._total_time
@@ -950,7 +1219,7 @@ class VoiceAgentClient(AsyncClient):
         """
 
         # Skip if not enabled
-        if not self.listeners(AgentServerMessageType.SPEAKER_METRICS):
+        if not self._has_listeners(AgentServerMessageType.SPEAKER_METRICS):
             return
 
         changes_detected = False
@@ -1060,104 +1329,130 @@ class VoiceAgentClient(AsyncClient):
             True if the speech fragments were updated, False otherwise.
         """
 
-        async with self._speech_fragments_lock:
-            # Parsed new speech data from the STT engine
-            fragments: list[SpeechFragment] = []
-
-            # Metadata
-            metadata = message.get("metadata", {})
-            payload_end_time = metadata.get("end_time", 0)
-
-            # Iterate over the results in the payload
-            for result in message.get("results", []):
-                alt = result.get("alternatives", [{}])[0]
-                if alt.get("content", None):
-                    # Create the new fragment
-                    fragment = SpeechFragment(
-                        idx=self._next_fragment_id(),
-                        start_time=result.get("start_time", 0),
-                        end_time=result.get("end_time", 0),
-                        language=alt.get("language", "en"),
-                        direction=alt.get("direction", "ltr"),
-                        type_=result.get("type", "word"),
-                        is_eos=result.get("is_eos", False),
-                        is_disfluency="disfluency" in alt.get("tags", []),
-                        is_punctuation=result.get("type", "") == "punctuation",
-                        is_final=is_final,
-                        attaches_to=result.get("attaches_to", ""),
-                        content=alt.get("content", ""),
-                        speaker=alt.get("speaker", "UU"),
-                        confidence=alt.get("confidence", 1.0),
-                        volume=result.get("volume", None),
-                        result={"final": is_final, **result},
-                    )
+        # Note: the buffer is only ever changed synchronously (no awaits between a read
+        # and the matching write), so no lock is needed on the single event loop.
 
-                    # Check fragment is after trim time
-                    if fragment.start_time < self._trim_before_time:
-                        continue
+        # Parsed new speech data from the STT engine
+        fragments: list[SpeechFragment] = []
 
-                    # Speaker filtering
-                    if fragment.speaker:
-                        # Drop `__XX__` speakers
-                        if re.match(r"^__[A-Z0-9_]{2,}__$", fragment.speaker):
-                            continue
+        # Metadata
+        metadata = message.get("metadata", {})
+        payload_end_time = metadata.get("end_time", 0)
+
+        # Speaker filters (constant for the whole payload, so resolved once)
+        focus_speakers: Optional[frozenset[str]] = None
+        if self._dz_config.focus_mode == SpeakerFocusMode.IGNORE and self._dz_focus_speakers:
+            focus_speakers = self._dz_focus_speakers
+        ignore_speakers: Optional[frozenset[str]] = self._dz_ignore_speakers or None
+
+        # Fragment IDs (spaced by 10, leaving room for inserted fragments)
+        next_fragment_id = self._next_fragment_id
+
+        # Small closed-set strings are interned, so later comparisons can match on identity
+        intern = sys.intern
+
+        # Iterate over the results in the payload
+        for result in message.get("results", []):
+            # Skip results without content
+            alternatives = result.get("alternatives")
+            if not alternatives:
+                continue
+            alt = alternatives[0]
+            content = alt.get("content")
+            if content:
+                # Fields used more than once
+                result_type = intern(result.get("type", "word"))
+                speaker = alt.get("speaker", "UU")
+                tags = alt.get("tags")
+
+                # Create the new fragment
+                fragment = SpeechFragment(
+                    idx=next_fragment_id(),
+                    start_time=result.get("start_time", 0),
+                    end_time=result.get("end_time", 0),
+                    language=intern(alt.get("language", "en")),
+                    direction=alt.get("direction", "ltr"),
+                    type_=result_type,
+                    is_eos=result.get("is_eos", False),
+                    is_disfluency=tags is not None and "disfluency" in tags,
+                    is_punctuation=result_type == "punctuation",
+                    is_final=is_final,
+                    attaches_to=intern(result.get("attaches_to", "")),
+                    content=content,
+                    speaker=intern(speaker) if speaker else speaker,
+                    confidence=alt.get("confidence", 1.0),
+                    volume=result.get("volume", None),
+                    result=result,
+                )
 
-                        # Drop speakers not focussed on
-                        if (
-                            self._dz_config.focus_mode == SpeakerFocusMode.IGNORE
-                            and self._dz_config.focus_speakers
-                            and fragment.speaker not in self._dz_config.focus_speakers
-                        ):
-                            continue
+                # Check fragment is after trim time
+                if fragment.start_time < self._trim_before_time:
+                    continue
 
-                        # Drop ignored speakers
-                        if self._dz_config.ignore_speakers and fragment.speaker in self._dz_config.ignore_speakers:
-                            continue
+                # Speaker filtering
+                if fragment.speaker:
+                    # Drop `__XX__` speakers
+                    if _is_blocked_speaker(fragment.speaker):
+                        continue
 
-                    # Add the fragment
-                    fragments.append(fragment)
+                    # Drop speakers not focussed on
+                    if focus_speakers is not None and fragment.speaker not in focus_speakers:
+                        continue
 
-                    # Track the last fragment end time
-                    self._last_fragment_end_time = max(self._last_fragment_end_time, fragment.end_time)
+                    # Drop ignored speakers
+                    if ignore_speakers is not None and fragment.speaker in ignore_speakers:
+                        continue
 
-            # Evaluate for VAD (only done on partials)
-            await self._vad_evaluation(fragments, is_final=is_final)
+                # Add the fragment
+                fragments.append(fragment)
 
-            # Fragments to retain
-            retained_fragments = [
-                frag for frag in self._speech_fragments if frag.is_final and frag.start_time >= self._trim_before_time
-            ]
+                # Track the last fragment end time
+                self._last_fragment_end_time = max(self._last_fragment_end_time, fragment.end_time)
 
-            # Re-structure the speech fragments
-            self._speech_fragments = retained_fragments.copy()
-            self._speech_fragments.extend(fragments)
-            self._speech_fragments.sort(key=lambda x: x.idx)
+        # Evaluate for VAD (only done on partials)
+        await self._vad_evaluation(fragments, is_final=is_final)
 
-            # Remove fragment at head that is for previous
-            if (
-                self._speech_fragments
-                and self._speech_fragments[0].is_punctuation
-                and self._speech_fragments[0].attaches_to == "previous"
-            ):
-                self._speech_fragments.pop(0)
+        # Retain finals after the trim time (partials are only ever held at the tail)
+        self._trim_fragments_before(self._trim_before_time)
+        while self._speech_fragments and not self._speech_fragments[-1].is_final:
+            self._speech_fragments.pop()
+
+        # Add the new fragments (already ordered, as new fragment IDs always follow retained ones)
+        self._speech_fragments.extend(fragments)
+
+        # Remove fragment at head that is for previous
+        if (
+            self._speech_fragments
+            and self._speech_fragments[0].is_punctuation
+            and self._speech_fragments[0].attaches_to == "previous"
+        ):
+            self._speech_fragments.popleft()
 
-            # Update TTFB (only if there are listeners)
-            if not is_final:
-                self._calculate_ttfb(end_time=payload_end_time)
+        # Update TTFB (only if there are listeners)
+        if not is_final:
+            self._calculate_ttfb(end_time=payload_end_time)
 
-            # Fragments available
-            return len(self._speech_fragments) > 0
+        # Fragments available
+        return len(self._speech_fragments) > 0
 
     # ============================================================================
     # SEGMENT PROCESSING & EMISSION
     # ============================================================================
 
-    def _update_current_view(self) -> None:
-        """Load the current view of the speech fragments."""
+    def _update_current_view(self, annotate_segments: bool = True) -> None:
+        """Load the current view of the speech fragments.
+
+        The view takes its own copy of the fragments during validation, so the
+        buffer is passed by reference rather than copied here as well.
+
+        Args:
+            annotate_segments: Whether to annotate the segments of the view.
+        """
         self._current_view = SpeakerSegmentView(
             session=self._client_session,
-            fragments=self._speech_fragments.copy(),
-            focus_speakers=self._dz_config.focus_speakers,
+            fragments=self._speech_fragments,
+            focus_speakers=self._dz_focus_speakers,
+            annotate_segments=annotate_segments,
         )
 
     async def _process_speech_fragments(self, change_filter: Optional[list[AnnotationFlags]] = None) -> None:
@@ -1171,35 +1466,38 @@ class VoiceAgentClient(AsyncClient):
             change_filter: Optional list of annotation flags to filter changes.
         """
 
-        # Lock the speech fragments
-        async with self._speech_fragments_lock:
-            """Creates a new view of the fragments and compares against the last view."""
+        # Create a view of the current segments (no awaits, so no lock is required), deferring
+        # annotation as the segments are rebuilt and annotated when the view is trimmed
+        self._update_current_view(annotate_segments=False)
 
-            # Create a view of the current segments
-            self._update_current_view()
+        # Check view exists
+        if not self._current_view:
+            return
 
-            # Check view exists
-            if not self._current_view:
-                return
+        # Check we have at least one segment
+        if self._current_view.segment_count == 0:
+            return
 
-            # Check we have at least one segment
-            if self._current_view.segment_count == 0 or self._current_view.last_active_segment_index == -1:
-                return
+        # Without an active segment there is nothing to trim, so annotate the view as-is
+        last_active_segment_index = self._current_view.last_active_segment_index
+        if last_active_segment_index == -1:
+            self._current_view.annotate()
+            return
 
-            # Create a view of segments to emit
-            last_segment = self._current_view.segments[self._current_view.last_active_segment_index]
+        # Create a view of segments to emit
+        last_segment = self._current_view.segments[last_active_segment_index]
 
-            # Trim the view
-            self._current_view.trim(start_time=self._current_view.start_time, end_time=last_segment.end_time)
+        # Trim the view
+        self._current_view.trim(start_time=self._current_view.start_time, end_time=last_segment.end_time)
 
-            # Compare previous view to this view
-            if self._previous_view:
-                changes = FragmentUtils.compare_views(self._client_session, self._previous_view, self._current_view)
-            else:
-                changes = AnnotationResult.from_flags(AnnotationFlags.NEW)
+        # Compare previous view to this view
+        if self._previous_view:
+            changes = FragmentUtils.compare_views(self._client_session, self._previous_view, self._current_view)
+        else:
+            changes = AnnotationResult.from_flags(AnnotationFlags.NEW)
 
-            # Update the previous view
-            self._previous_view = self._current_view
+        # Update the previous view
+        self._previous_view = self._current_view
 
         # Catch no changes
         if change_filter and not changes.any(*change_filter):
@@ -1250,39 +1548,62 @@ class VoiceAgentClient(AsyncClient):
                 await self._emit_end_of_turn()
             return
 
-        # Lock the speech fragments
-        async with self._speech_fragments_lock:
-            # Segments to emit
-            final_segments: list[SpeakerSegment] = []
-            partial_segments: list[SpeakerSegment] = []
-
-            # Keep until end of turn (`ON_END_OF_TURN`)
-            if not finalize and not self._config.speech_segment_config.emit_sentences:
-                partial_segments = self._current_view.segments if self._current_view else []
-
-            # Force finalize
-            elif finalize:
-                final_segments = self._current_view.segments if self._current_view else []
+        # Segments to emit
+        final_segments: list[SpeakerSegment] = []
+        partial_segments: list[SpeakerSegment] = []
+
+        # Keep until end of turn (`ON_END_OF_TURN`)
+        if not finalize and not self._config.speech_segment_config.emit_sentences:
+            partial_segments = self._current_view.segments if self._current_view else []
+
+        # Force finalize
+        elif finalize:
+            final_segments = self._current_view.segments if self._current_view else []
+
+        # Split between finals and interim segments (`ON_FINALIZED_SENTENCE`) in a single pass
+        elif self._current_view:
+            for s in self._current_view.segments:
+                if s.annotation.has(AnnotationFlags.ENDS_WITH_FINAL, AnnotationFlags.ENDS_WITH_EOS):
+                    final_segments.append(s)
+                else:
+                    partial_segments.append(s)
+
+        # Remove partial segments that have no final fragments
+        if not self._config.include_partials:
+            partial_segments = [s for s in partial_segments if s.annotation.has(AnnotationFlags.HAS_FINAL)]
+
+        # Emit finals first
+        if final_segments:
+            """Final segments are checked for end of sentence."""
+
+            # Ensure final segment ends with EOS
+            if self._config.speech_segment_config.add_trailing_eos:
+                last_segment = final_segments[-1]
+                last_fragment = last_segment.fragments[-1]
+                if not last_fragment.is_eos:
+                    # Add new fragment
+                    last_segment.fragments.append(
+                        SpeechFragment(
+                            idx=self._next_fragment_id(),
+                            start_time=last_fragment.end_time,
+                            end_time=last_fragment.end_time,
+                            content=".",
+                            attaches_to="previous",
+                            is_eos=True,
+                        )
+                    )
+                    # Update text
+                    FragmentUtils.update_segment_text(
+                        session=self._client_session,
+                        segment=last_segment,
+                    )
 
-            # Split between finals and interim segments (`ON_FINALIZED_SENTENCE`)
-            else:
-                final_segments = [
-                    s
-                    for s in (self._current_view.segments if self._current_view else [])
-                    if s.annotation.has(AnnotationFlags.ENDS_WITH_FINAL, AnnotationFlags.ENDS_WITH_EOS)
-                ]
-                partial_segments = [
-                    s for s in (self._current_view.segments if self._current_view else []) if s not in final_segments
-                ]
-
-            # Remove partial segments that have no final fragments
-            if not self._config.include_partials:
-                partial_segments = [s for s in partial_segments if s.annotation.has(AnnotationFlags.HAS_FINAL)]
-
-            # Emit finals first
-            if final_segments:
-                """Final segments are checked for end of sentence."""
+            # Mark the final segments as end of utterance
+            if is_eou:
+                final_segments[-1].is_eou = True
 
+            # Emit segments (skip building the message if no one is listening)
+            if self._has_listeners(_ADD_SEGMENT):
                 # Metadata for final segments uses actual start/end times of the segments being emitted
                 final_metadata = MessageTimeMetadata(
                     start_time=final_segments[0].start_time,
@@ -1290,36 +1611,10 @@ class VoiceAgentClient(AsyncClient):
                     processing_time=round(self._last_ttfb, 3),
                 )
 
-                # Ensure final segment ends with EOS
-                if self._config.speech_segment_config.add_trailing_eos:
-                    last_segment = final_segments[-1]
-                    last_fragment = last_segment.fragments[-1]
-                    if not last_fragment.is_eos:
-                        # Add new fragment
-                        last_segment.fragments.append(
-                            SpeechFragment(
-                                idx=self._next_fragment_id(),
-                                start_time=last_fragment.end_time,
-                                end_time=last_fragment.end_time,
-                                content=".",
-                                attaches_to="previous",
-                                is_eos=True,
-                            )
-                        )
-                        # Update text
-                        FragmentUtils.update_segment_text(
-                            session=self._client_session,
-                            segment=last_segment,
-                        )
-
-                # Mark the final segments as end of utterance
-                if is_eou:
-                    final_segments[-1].is_eou = True
-
-                # Emit segments
+                # Emit the message
                 self._emit_message(
                     SegmentMessage(
-                        message=AgentServerMessageType.ADD_SEGMENT,
+                        message=_ADD_SEGMENT,
                         segments=[
                             SegmentMessageSegment(
                                 speaker_id=s.speaker_id,
@@ -1330,7 +1625,7 @@ class VoiceAgentClient(AsyncClient):
                                 annotation=s.annotation,
                                 is_eou=s.is_eou,
                                 fragments=(
-                                    [SegmentMessageSegmentFragment(**f.__dict__) for f in s.fragments]
+                                    [SegmentMessageSegmentFragment.model_validate(f.__dict__) for f in s.fragments]
                                     if self._config.include_results
                                     else None
                                 ),
@@ -1341,59 +1636,107 @@ class VoiceAgentClient(AsyncClient):
                         metadata=final_metadata,
                     ),
                 )
-                self._trim_before_time = final_segments[-1].end_time
-                self._speech_fragments = [f for f in self._speech_fragments if f.start_time >= self._trim_before_time]
 
-            # Emit interim segments (suppress when forced EOU is active)
-            if partial_segments and not self._forced_eou_active:
-                """Partial segments are emitted as is."""
+            # Trim the emitted fragments
+            self._trim_before_time = final_segments[-1].end_time
+            self._trim_fragments_before(self._trim_before_time)
 
-                # Metadata for partial segments uses actual start/end times of the segments being emitted
-                partial_metadata = MessageTimeMetadata(
-                    start_time=partial_segments[0].start_time,
-                    end_time=partial_segments[-1].end_time,
-                    processing_time=round(self._last_ttfb, 3),
-                )
+        # Emit interim segments (suppress when forced EOU is active)
+        if partial_segments and not self._forced_eou_active:
+            """Partial segments are emitted as is, or coalesced when debounce is enabled."""
 
-                # Emit segments
-                self._emit_message(
-                    SegmentMessage(
-                        message=AgentServerMessageType.ADD_PARTIAL_SEGMENT,
-                        segments=[
-                            SegmentMessageSegment(
-                                speaker_id=s.speaker_id,
-                                is_active=s.is_active,
-                                timestamp=s.timestamp,
-                                language=s.language,
-                                text=s.text,
-                                annotation=s.annotation,
-                                fragments=(
-                                    [SegmentMessageSegmentFragment(**f.__dict__) for f in s.fragments]
-                                    if self._config.include_results
-                                    else None
-                                ),
-                                metadata=MessageTimeMetadata(start_time=s.start_time, end_time=s.end_time),
-                            )
-                            for s in partial_segments
-                        ],
-                        metadata=partial_metadata,
-                    ),
-                )
+            # Coalesce rapid updates and emit the latest segments once the window expires
+            if self._config.speech_segment_config.partial_debounce > 0:
+                self._pending_partial_segments = partial_segments
+                if not self._pending_partial_handle:
+                    self._pending_partial_handle = asyncio.get_running_loop().call_later(
+                        self._config.speech_segment_config.partial_debounce, self._flush_partial_segments
+                    )
+
+            # Emit immediately
+            else:
+                self._emit_partial_segments(partial_segments)
+
+        # Drop any pending (now stale) interim segments
+        else:
+            self._cancel_pending_partial_segments()
 
-            # Update the current view
-            self._update_current_view()
+        # Update the current view
+        self._update_current_view()
 
-            # Reset the turn start time
-            if not self._turn_start_time and self._current_view:
-                self._turn_start_time = self._current_view.start_time
+        # Reset the turn start time
+        if not self._turn_start_time and self._current_view:
+            self._turn_start_time = self._current_view.start_time
 
-            # Send updated speaker metrics
-            self._calculate_speaker_metrics(partial_segments, final_segments)
+        # Send updated speaker metrics
+        self._calculate_speaker_metrics(partial_segments, final_segments)
 
         # Emit end of turn
         if finalize:
             await self._emit_end_of_turn()
 
+    def _emit_partial_segments(self, partial_segments: list[SpeakerSegment]) -> None:
+        """Emit interim segments to listeners.
+
+        Args:
+            partial_segments: The partial segments to emit.
+        """
+
+        # Skip building the message if no one is listening
+        if not self._has_listeners(_ADD_PARTIAL_SEGMENT):
+            return
+
+        # Metadata for partial segments uses actual start/end times of the segments being emitted
+        partial_metadata = MessageTimeMetadata(
+            start_time=partial_segments[0].start_time,
+            end_time=partial_segments[-1].end_time,
+            processing_time=round(self._last_ttfb, 3),
+        )
+
+        # Emit segments
+        self._emit_message(
+            SegmentMessage(
+                message=_ADD_PARTIAL_SEGMENT,
+                segments=[
+                    SegmentMessageSegment(
+                        speaker_id=s.speaker_id,
+                        is_active=s.is_active,
+                        timestamp=s.timestamp,
+                        language=s.language,
+                        text=s.text,
+                        annotation=s.annotation,
+                        fragments=(
+                            [SegmentMessageSegmentFragment.model_validate(f.__dict__) for f in s.fragments]
+                            if self._config.include_results
+                            else None
+                        ),
+                        metadata=MessageTimeMetadata(start_time=s.start_time, end_time=s.end_time),
+                    )
+                    for s in partial_segments
+                ],
+                metadata=partial_metadata,
+            ),
+        )
+
+    def _flush_partial_segments(self) -> None:
+        """Emit the latest coalesced interim segments (debounce timer callback)."""
+
+        # Take the pending segments
+        partial_segments = self._pending_partial_segments
+        self._pending_partial_segments = None
+        self._pending_partial_handle = None
+
+        # Emit (suppress when forced EOU is active)
+        if partial_segments and not self._forced_eou_active:
+            self._emit_partial_segments(partial_segments)
+
+    def _cancel_pending_partial_segments(self) -> None:
+        """Cancel any coalesced interim segments waiting to be emitted."""
+        if self._pending_partial_handle:
+            self._pending_partial_handle.cancel()
+            self._pending_partial_handle = None
+        self._pending_partial_segments = None
+
     async def _emit_start_of_turn(self, event_time: float) -> None:
         """Emit the start of turn message."""
 
@@ -1531,7 +1874,7 @@ class VoiceAgentClient(AsyncClient):
 
         # Result to validate against
         if last_active_segment:
-            annotation.add(*[AnnotationFlags(flag) for flag in last_active_segment.annotation])
+            annotation.add(*[_ANNOTATION_FLAGS_BY_VALUE[flag] for flag in last_active_segment.annotation])
 
         # Apply penalties based on last active segment annotations
         if len(annotation) > 0:
@@ -1714,15 +2057,22 @@ class VoiceAgentClient(AsyncClient):
             is_final: Whether the fragments are final.
         """
 
-        # Filter fragments for valid speakers, if required
-        if self._dz_enabled and self._dz_config.focus_speakers:
-            fragments = [f for f in fragments if f.speaker in self._dz_config.focus_speakers]
-
-        # Find partial and final words
-        words = [f for f in fragments if f.type_ == "word"]
-
-        # Check if we have any new words
-        has_words = len(words) > 0
+        # Valid speakers to filter on, if required
+        focus_speakers = self._dz_focus_speakers if self._dz_enabled and self._dz_focus_speakers else None
+
+        # Find the first / last partial or final words and count them (single pass, finals only need the first)
+        first_word: Optional[SpeechFragment] = None
+        last_word: Optional[SpeechFragment] = None
+        word_count = 0
+        for frag in fragments:
+            if frag.type_ != "word" or (focus_speakers is not None and frag.speaker not in focus_speakers):
+                continue
+            if first_word is None:
+                first_word = frag
+                if is_final:
+                    break
+            last_word = frag
+            word_count += 1
 
         # Handle finals
         if is_final:
@@ -1734,36 +2084,39 @@ class VoiceAgentClient(AsyncClient):
             """
 
             # Check if transcript went straight to finals (typical with forced end of utterance)
-            if not self._is_speaking and has_words and self._last_valid_partial_word_count == 0:
+            if not self._is_speaking and first_word is not None and self._last_valid_partial_word_count == 0:
                 # Track the current speaker
-                self._current_speaker = words[0].speaker
+                self._current_speaker = first_word.speaker
                 self._is_speaking = True
 
                 # Emit speaker started event
-                await self._handle_speaker_started(self._current_speaker, words[0].start_time)
+                await self._handle_speaker_started(self._current_speaker, first_word.start_time)
 
             # No further processing needed
             return
 
         # Track partial count
-        self._last_valid_partial_word_count = len(words)
+        self._last_valid_partial_word_count = word_count
+
+        # Steady state without diarization (no speaker switching and no change in speaking state)
+        if not self._dz_enabled and (word_count > 0) == self._is_speaking:
+            if last_word is not None:
+                self._current_speaker = last_word.speaker
+            return
 
         # Current states
         current_is_speaking = self._is_speaking
         current_speaker = self._current_speaker
 
         # Establish the speaker from latest partials
-        latest_speaker = words[-1].speaker if has_words else current_speaker
-
-        # Determine if the speaker has changed (and we have a speaker)
-        speaker_changed = latest_speaker != current_speaker and current_speaker is not None
+        latest_speaker = last_word.speaker if last_word is not None else current_speaker
 
         # Start / end times (earliest and latest)
-        speaker_start_time = words[0].start_time if has_words else None
+        speaker_start_time = first_word.start_time if first_word is not None else None
         speaker_end_time = self._last_fragment_end_time
 
-        # If diarization is enabled, indicate speaker switching
-        if self._dz_enabled and latest_speaker is not None:
+        # If diarization is enabled, indicate speaker switching (nothing to do when disabled)
+        if self._dz_enabled:
             """When enabled, we send a speech events if the speaker has changed.
 
             This will emit a SPEAKER_ENDED for the previous speaker and a SPEAKER_STARTED
@@ -1773,45 +2126,37 @@ class VoiceAgentClient(AsyncClient):
             emit events to indicate when speakers switch.
             """
 
-            # Check if speaker is different to the current speaker
-            if current_is_speaking and speaker_changed:
-                self._emit_message(
-                    SpeakerStatusMessage(
-                        message=AgentServerMessageType.SPEAKER_ENDED,
-                        speaker_id=current_speaker,
-                        is_active=False,
-                        time=speaker_end_time,
-                    ),
-                )
-                self._emit_message(
-                    SpeakerStatusMessage(
-                        message=AgentServerMessageType.SPEAKER_STARTED,
-                        speaker_id=latest_speaker,
-                        is_active=True,
-                        time=speaker_end_time,
-                    ),
-                )
+            # Check if speaker is different to the current speaker (and we have a speaker)
+            if (
+                current_is_speaking
+                and latest_speaker is not None
+                and current_speaker is not None
+                and latest_speaker != current_speaker
+            ):
+                self._emit_speaker_status(current_speaker, is_active=False, event_time=speaker_end_time)
+                self._emit_speaker_status(latest_speaker, is_active=True, event_time=speaker_end_time)
                 self._last_speak_start_time = speaker_end_time
 
         # Update current speaker
         self._current_speaker = latest_speaker
 
         # No further processing if we have no new fragments and we are not speaking
-        if has_words == current_is_speaking:
+        if (word_count > 0) == current_is_speaking:
             return
 
         # Update speaking state
-        self._is_speaking = not current_is_speaking
+        is_speaking = not current_is_speaking
+        self._is_speaking = is_speaking
 
         # Event time
-        event_time = speaker_start_time if self._is_speaking else speaker_end_time
+        event_time = speaker_start_time if is_speaking else speaker_end_time
 
         # Skip if no event time
         if event_time is None:
             return
 
         # Speaker events
-        if self._is_speaking:
+        if is_speaking:
             await self._handle_speaker_started(latest_speaker, event_time)
         else:
             await self._handle_speaker_stopped(latest_speaker, speaker_end_time)
@@ -1882,14 +2227,7 @@ class VoiceAgentClient(AsyncClient):
             self._turn_handler.reset()
 
         # Emit the event
-        self._emit_message(
-            SpeakerStatusMessage(
-                message=AgentServerMessageType.SPEAKER_STARTED,
-                speaker_id=speaker,
-                is_active=True,
-                time=event_time,
-            ),
-        )
+        self._emit_speaker_status(speaker, is_active=True, event_time=event_time)
 
         # Reset the handlers
         self._turn_handler.reset()
@@ -1911,26 +2249,58 @@ class VoiceAgentClient(AsyncClient):
             self._run_background_eot_calculation(fn, "speaker_stopped")
 
         # Emit the event
-        self._emit_message(
-            SpeakerStatusMessage(
-                message=AgentServerMessageType.SPEAKER_ENDED,
-                speaker_id=speaker,
-                is_active=False,
-                time=event_time,
-            ),
-        )
+        self._emit_speaker_status(speaker, is_active=False, event_time=event_time)
 
         # Reset current speaker
         self._current_speaker = None
 
+    def _emit_speaker_status(self, speaker: Optional[str], is_active: bool, event_time: float) -> None:
+        """Emit a `SPEAKER_STARTED` or `SPEAKER_ENDED` event.
+
+        Speaker IDs come from a small set, so the serialised message (without the
+        time) is built once per speaker and state, then copied for each event.
+
+        Args:
+            speaker: The speaker ID.
+            is_active: Whether the speaker has started (True) or ended (False).
+            event_time: The time of the event.
+        """
+
+        # Message type
+        message_type: Literal[AgentServerMessageType.SPEAKER_STARTED, AgentServerMessageType.SPEAKER_ENDED] = (
+            _SPEAKER_STARTED if is_active else _SPEAKER_ENDED
+        )
+
+        # Skip if no one is listening
+        if not self._has_listeners(message_type):
+            return
+
+        # Cached payload for the speaker and state
+        payload = self._speaker_status_payloads.get((speaker, is_active))
+        if payload is None:
+            payload = SpeakerStatusMessage(message=message_type, speaker_id=speaker, is_active=is_active).to_dict()
+            self._speaker_status_payloads[(speaker, is_active)] = payload
+
+        # Emit a copy with the event time
+        self.emit(message_type, {**payload, "time": event_time})
+
     # ============================================================================
     # HELPER METHODS
     # ============================================================================
 
-    def _next_fragment_id(self) -> int:
-        """Return the next fragment ID."""
-        self._fragment_idx += 10
-        return self._fragment_idx
+    def _trim_fragments_before(self, trim_time: float) -> None:
+        """Drop fragments from the buffer that start before a given time.
+
+        Fragment start times are not guaranteed to be monotonic along the buffer, so
+        every fragment is checked rather than only a prefix. The buffer is only
+        rebuilt when something is removed.
+
+        Args:
+            trim_time: Fragments starting before this time are removed.
+        """
+        fragments = self._speech_fragments
+        if any(frag.start_time < trim_time for frag in fragments):
+            self._speech_fragments = deque(frag for frag in fragments if frag.start_time >= trim_time)
 
     def _get_endpoint_url(self, url: str, app: Optional[str] = None) -> str:
         """Format the endpoint URL with the SDK and app versions.
@@ -1942,19 +2312,4 @@ class VoiceAgentClient(AsyncClient):
         Returns:
             str: The formatted endpoint URL.
         """
-
-        # Parse the URL to extract existing query parameters
-        parsed = urlparse(url)
-
-        # Extract existing params into a dict of lists, keeping params without values
-        params = parse_qs(parsed.query, keep_blank_values=True)
-
-        # Use the provided app name, or fallback to existing value, or use the default string
-        existing_app = params.get("sm-app", [None])[0]
-        app_name = app or existing_app or f"voice-sdk/{__version__}"
-        params["sm-app"] = [app_name]
-        params["sm-voice-sdk"] = [__version__]
-
-        # Re-encode the query string and reconstruct
-        updated_query = urlencode(params, doseq=True)
-        return urlunparse(parsed._replace(query=updated_query))
+        return _build_endpoint_url(url, app)
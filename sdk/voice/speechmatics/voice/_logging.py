@@ -50,9 +50,10 @@ def get_logger(name: str) -> logging.Logger:
     # Lower RT logging to INFO to reduce noise
     logging.getLogger("speechmatics.rt").setLevel(logging.INFO)
 
-    # Logging for Voice SDK
+    # Logging for Voice SDK (loggers are cached, so only attach the NullHandler once)
     module_logger = logging.getLogger(name)
-    module_logger.addHandler(logging.NullHandler())
+    if not any(isinstance(handler, logging.NullHandler) for handler in module_logger.handlers):
+        module_logger.addHandler(logging.NullHandler())
     return module_logger
 
 
@@ -5,6 +5,9 @@
 from __future__ import annotations
 
 import datetime
+import sys
+from collections.abc import Collection
+from collections.abc import Sequence
 from enum import Enum
 from typing import Any
 from typing import Literal
@@ -13,6 +16,7 @@ from typing import Optional
 from pydantic import BaseModel as PydanticBaseModel
 from pydantic import ConfigDict
 from pydantic import Field
+from pydantic import PrivateAttr
 from pydantic import model_validator
 from typing_extensions import Self
 
@@ -263,6 +267,13 @@ class AnnotationFlags(str, Enum):
     SMART_TURN_FALSE = "smart_turn_false"
 
 
+# Flag lookup by value, built once rather than going through `AnnotationFlags(value)` per flag
+_ANNOTATION_FLAGS_BY_VALUE: dict[str, AnnotationFlags] = {flag.value: flag for flag in AnnotationFlags}
+
+# Interned flag values, avoiding the `Enum.value` property on the annotation hot path
+_ANNOTATION_FLAG_VALUES: dict[AnnotationFlags, str] = {flag: sys.intern(flag.value) for flag in AnnotationFlags}
+
+
 # ==============================================================================
 # CONFIGURATION MODELS
 # ==============================================================================
@@ -382,11 +393,17 @@ class SpeechSegmentConfig(BaseModel):
             when a pause is detected using the string provided. For example, `...` would add this text
             into the formatted output for a segment as `Hello ... how are you?`.
             Defaults to None.
+
+        partial_debounce: Coalesce rapid partial segment updates into a single emission. When set,
+            `AddPartialSegment` messages are emitted at most once per this many seconds, using the
+            latest view of the segments. Final segments are never delayed. A value of `0.03` is a
+            good starting point. Defaults to `0.0` (disabled).
     """
 
     add_trailing_eos: bool = False
     emit_sentences: bool = True
     pause_mark: Optional[str] = None
+    partial_debounce: float = 0.0
 
 
 class EndOfTurnPenaltyItem(BaseModel):
@@ -597,6 +614,10 @@ class VoiceAgentConfig(BaseModel):
 
         audio_buffer_length: Length of internal rolling audio buffer in seconds. Defaults to `0.0`.
 
+        audio_coalesce_length: Length of audio in seconds to accumulate before sending it to the
+            server as a single frame. Small frames are batched to reduce per-frame WebSocket
+            overhead, at the cost of up to this much added latency. Defaults to `0.0` (disabled).
+
         advanced_engine_control: Internal use only.
 
         sample_rate: Audio sample rate for streaming. Defaults to `16000`.
@@ -702,6 +723,7 @@ class VoiceAgentConfig(BaseModel):
     smart_turn_config: Optional[SmartTurnConfig] = None
     speech_segment_config: SpeechSegmentConfig = Field(default_factory=SpeechSegmentConfig)
     audio_buffer_length: float = 0.0
+    audio_coalesce_length: float = 0.0
 
     # Advanced engine configuration
     advanced_engine_control: Optional[dict[str, Any]] = None
@@ -841,34 +863,43 @@ class SessionSpeaker(BaseModel):
 
 
 class AnnotationResult(list):
-    """Processing result."""
+    """Processing result.
+
+    Flag values are held only as the list itself. Multi-flag checks build a set
+    of the values for that call, so there is no second copy to keep in step
+    with the list.
+    """
+
+    __slots__ = ()
 
     @staticmethod
     def from_flags(*flags: AnnotationFlags) -> AnnotationResult:
         """Create an AnnotationResult from a list of flags."""
-        r = AnnotationResult()
-        r.add(*flags)
-        return r
+        return AnnotationResult(dict.fromkeys(_ANNOTATION_FLAG_VALUES[flag] for flag in flags))
 
     def add(self, *flags: AnnotationFlags) -> None:
         """Add a flag(s) to the object."""
         for flag in flags:
             if flag not in self:
-                self.append(flag.value)
+                self.append(_ANNOTATION_FLAG_VALUES[flag])
 
     def remove(self, *flags: AnnotationFlags) -> None:
         """Remove a flag(s) from the object."""
         for flag in flags:
             if flag in self:
-                super().remove(flag.value)
+                super().remove(_ANNOTATION_FLAG_VALUES[flag])
 
     def has(self, *flags: AnnotationFlags) -> bool:
         """Check if the object has all given flags."""
-        return all(f.value in set(self) for f in flags)
+        if len(flags) == 1:
+            return flags[0] in self
+        return set(self).issuperset(flags)
 
     def any(self, *flags: AnnotationFlags) -> bool:
         """Check if the object has any of the given flags."""
-        return any(f.value in set(self) for f in flags)
+        if len(flags) == 1:
+            return flags[0] in self
+        return not set(self).isdisjoint(flags)
 
     def __eq__(self, other: object) -> bool:
         """Check if the object is equal to another."""
@@ -904,7 +935,7 @@ class SpeechFragment(BaseModel):
         speaker: Speaker of the fragment (if diarization is enabled). Defaults to `None`.
         confidence: Confidence of the fragment (0.0 to 1.0). Defaults to `1.0`.
         volume: Volume of the fragment (0.0 to 100.0). Defaults to `None`.
-        result: Raw result of the fragment from the TTS.
+        result: Raw result of the fragment from the STT engine (shared, not copied).
         annotation: Annotation for the fragment.
     """
 
@@ -991,9 +1022,11 @@ class SpeakerSegment(BaseModel):
         data["start_time"] = self.start_time
         data["end_time"] = self.end_time
 
-        # Add results if requested
+        # Add results if requested (tagged with the finality of each fragment)
         if include_results:
-            data["results"] = [f.result for f in self.fragments]
+            data["results"] = [
+                {"final": f.is_final, **f.result} if f.result is not None else None for f in self.fragments
+            ]
 
         # Return the dump
         return data
@@ -1005,30 +1038,36 @@ class SpeakerSegmentView(BaseModel):
     Parameters:
         session: ClientSessionInfo object.
         fragments: List of fragments.
-        focus_speakers: List of speakers to focus on or None.
+        focus_speakers: Set of speakers to focus on or None.
     """
 
     session: ClientSessionInfo
     fragments: list[SpeechFragment]
     segments: list[SpeakerSegment] = Field(default_factory=list)
-    focus_speakers: Optional[list[str]] = None
+    focus_speakers: Optional[frozenset[str]] = None
+
+    # Whether the segments have been annotated
+    _annotated: bool = PrivateAttr(default=False)
 
     def __init__(
         self,
         session: ClientSessionInfo,
-        fragments: list[SpeechFragment],
-        focus_speakers: Optional[list[str]] = None,
+        fragments: Sequence[SpeechFragment],
+        focus_speakers: Optional[Collection[str]] = None,
         annotate_segments: bool = True,
         **data: Any,
     ) -> None:
         # Lazy import to avoid circular dependency
         from ._utils import FragmentUtils
 
+        # Focus speakers as a set (checked once per segment)
+        focus_set = frozenset(focus_speakers) if focus_speakers else None
+
         # Process fragments into a list of segments
         segments = FragmentUtils.segment_list_from_fragments(
             session=session,
             fragments=fragments,
-            focus_speakers=focus_speakers,
+            focus_speakers=focus_set,
             annotate_segments=annotate_segments,
         )
 
@@ -1038,10 +1077,11 @@ class SpeakerSegmentView(BaseModel):
                 "session": session,
                 "fragments": fragments,
                 "segments": segments,
-                "focus_speakers": focus_speakers,
+                "focus_speakers": focus_set,
             }
         )
         super().__init__(**data)
+        self._annotated = annotate_segments
 
     @property
     def start_time(self) -> float:
@@ -1057,7 +1097,7 @@ class SpeakerSegmentView(BaseModel):
 
     @property
     def partial_count(self) -> int:
-        return sum(1 for frag in self.fragments if not frag.is_final)
+        return len(self.fragments) - self.final_count
 
     @property
     def segment_count(self) -> int:
@@ -1065,13 +1105,11 @@ class SpeakerSegmentView(BaseModel):
 
     @property
     def last_active_segment_index(self) -> int:
-        idx = next(
-            (i for i, segment in enumerate(reversed(self.segments)) if segment.is_active),
-            None,
-        )
-        if idx is None:
-            return -1
-        return len(self.segments) - idx - 1
+        segments = self.segments
+        for i in range(len(segments) - 1, -1, -1):
+            if segments[i].is_active:
+                return i
+        return -1
 
     def has_no_active_segments_remaining(self) -> bool:
         return self.last_active_segment_index == -1
@@ -1097,17 +1135,31 @@ class SpeakerSegmentView(BaseModel):
         # Lazy import to avoid circular dependency
         from ._utils import FragmentUtils
 
+        # Join a list (str.join would otherwise materialise a generator into one first)
+        session = self.session
+        format_segment_text = FragmentUtils.format_segment_text
         return separator.join(
-            FragmentUtils.format_segment_text(
-                session=self.session,
-                segment=segment,
-                format=format,
-                words_only=words_only,
-                include_partials=include_partials,
-            )
-            for segment in self.segments
+            [
+                format_segment_text(
+                    session=session,
+                    segment=segment,
+                    format=format,
+                    words_only=words_only,
+                    include_partials=include_partials,
+                )
+                for segment in self.segments
+            ]
         )
 
+    def annotate(self) -> None:
+        """Annotate the segments of a view created with `annotate_segments=False`."""
+        # Lazy import to avoid circular dependency
+        from ._utils import FragmentUtils
+
+        for segment in self.segments:
+            segment.annotation = FragmentUtils._annotate_segment(segment)
+        self._annotated = True
+
     def trim(self, start_time: float, end_time: float, annotate_segments: bool = True) -> None:
         """Trim a segment view to a specific time range.
 
@@ -1119,9 +1171,18 @@ class SpeakerSegmentView(BaseModel):
         # Lazy import to avoid circular dependency
         from ._utils import FragmentUtils
 
-        self.fragments = [
-            frag for frag in self.fragments if frag.start_time >= start_time and frag.end_time <= end_time
-        ]
+        # Fragments within the time range
+        fragments = [frag for frag in self.fragments if frag.start_time >= start_time and frag.end_time <= end_time]
+
+        # Nothing trimmed, so the existing segments still apply (annotating them if required)
+        if len(fragments) == len(self.fragments) and (annotate_segments or not self._annotated):
+            if annotate_segments and not self._annotated:
+                self.annotate()
+            return
+
+        # Rebuild the segments from the remaining fragments
+        self.fragments = fragments
+        self._annotated = annotate_segments
         self.segments = FragmentUtils.segment_list_from_fragments(
             session=self.session,
             fragments=self.fragments,
@@ -8,6 +8,10 @@ import asyncio
 from typing import Callable
 from typing import Optional
 
+from ._logging import get_logger
+
+logger = get_logger(__name__)
+
 
 class TurnTaskProcessor:
     """Container for turn task processing.
@@ -96,20 +100,22 @@ class TurnTaskProcessor:
         # Add the task to the list
         self._tasks[task_name] = task
 
-        # Wait for the task
-        async def wait_for_task(task: asyncio.Task) -> None:
-            try:
-                _handler_id = self._handler_id
-                await task
-                if _handler_id != self._handler_id:
-                    return
-                if not self.has_pending_tasks:
-                    asyncio.create_task(self._do_done_callback())
-            except asyncio.CancelledError:
-                pass
-
-        # Start the task
-        asyncio.create_task(wait_for_task(task))
+        # Wait for the task (done callback, rather than a separate waiter task)
+        _handler_id = self._handler_id
+
+        def on_task_done(task: asyncio.Task) -> None:
+            if task.cancelled():
+                return
+            exc = task.exception()
+            if exc is not None:
+                logger.warning("Exception in turn task %s", task_name, exc_info=exc)
+                return
+            if _handler_id != self._handler_id:
+                return
+            if not self.has_pending_tasks:
+                asyncio.create_task(self._do_done_callback())
+
+        task.add_done_callback(on_task_done)
 
     async def _do_done_callback(self) -> None:
         """Do the done callback."""
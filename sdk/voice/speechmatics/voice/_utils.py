@@ -7,6 +7,12 @@ from __future__ import annotations
 import datetime
 import re
 import unicodedata
+from collections import deque
+from collections.abc import Collection
+from collections.abc import Sequence
+from functools import lru_cache
+from itertools import groupby
+from operator import attrgetter
 from typing import Optional
 
 from ._models import AnnotationFlags
@@ -16,6 +22,18 @@ from ._models import SpeakerSegment
 from ._models import SpeakerSegmentView
 from ._models import SpeechFragment
 
+# Sort key for fragments (C-level attribute lookup)
+_FRAGMENT_IDX_KEY = attrgetter("idx")
+
+# Grouping key for runs of fragments from the same speaker
+_FRAGMENT_SPEAKER_KEY = attrgetter("speaker")
+
+
+@lru_cache(maxsize=256)
+def _segment_timestamp(base_time: datetime.datetime, start_time: float) -> str:
+    """ISO timestamp for a segment start (segments are rebuilt from the same fragments many times)."""
+    return (base_time + datetime.timedelta(seconds=start_time)).isoformat(timespec="milliseconds")
+
 
 class FragmentUtils:
     """Set of utility functions for working with SpeechFragment and SpeakerSegment objects."""
@@ -41,40 +59,34 @@ class FragmentUtils:
             str: The formatted text.
         """
 
-        # Cumulative contents
-        content = ""
-
-        # Select fragments to include
-        if words_only:
-            fragments = [frag for frag in segment.fragments if frag.type_ == "word"]
-        else:
-            fragments = segment.fragments
-
-        # Filter out partials if requested
-        if not include_partials:
-            fragments = [frag for frag in fragments if frag.is_final]
-
-        # Assemble the text
+        # Assemble the text in a single pass, skipping non-words / partials as requested
+        delimiter = session.language_pack_info.word_delimiter
+        parts: list[str] = []
+        first_frag: Optional[SpeechFragment] = None
         previous_frag: Optional[SpeechFragment] = None
-        for frag in fragments:
+        for frag in segment.fragments:
+            if (words_only and frag.type_ != "word") or (not include_partials and not frag.is_final):
+                continue
             if not previous_frag:
-                content = frag.content
-            elif frag.attaches_to == "previous" or previous_frag.attaches_to == "next":
-                content += frag.content
-            else:
-                content += session.language_pack_info.word_delimiter + frag.content
+                first_frag = frag
+            elif frag.attaches_to != "previous" and previous_frag.attaches_to != "next":
+                parts.append(delimiter)
+            parts.append(frag.content)
             previous_frag = frag
+        content = "".join(parts)
 
-        # Return the formatted text
-        return format.format(
-            **{
+        # Format the text (the plain text format needs no formatting)
+        if format == "{text}":
+            return content
+        return format.format_map(
+            {
                 "speaker_id": segment.speaker_id,
                 "text": content,
                 "content": content,
                 "ts": segment.timestamp,
                 "lang": segment.language,
-                "start_time": fragments[0].start_time if fragments else 0,
-                "end_time": fragments[-1].end_time if fragments else 0,
+                "start_time": first_frag.start_time if first_frag else 0,
+                "end_time": previous_frag.end_time if previous_frag else 0,
                 "annotation": segment.annotation or [],
             }
         )
@@ -82,8 +94,8 @@ class FragmentUtils:
     @staticmethod
     def segment_list_from_fragments(
         session: ClientSessionInfo,
-        fragments: list[SpeechFragment],
-        focus_speakers: Optional[list[str]] = None,
+        fragments: Sequence[SpeechFragment],
+        focus_speakers: Optional[Collection[str]] = None,
         annotate_segments: bool = True,
     ) -> list[SpeakerSegment]:
         """Create SpeakerSegment objects from a list of SpeechFragment objects.
@@ -91,34 +103,23 @@ class FragmentUtils:
         Args:
             session: ClientSessionInfo object.
             fragments: List of SpeechFragment objects.
-            focus_speakers: List of speakers to focus on or None.
+            focus_speakers: Speakers to focus on or None (ideally a set).
             annotate_segments: Whether to annotate segments.
 
         Returns:
             List of SpeakerSegment objects.
         """
 
-        # Speaker groups
-        current_speaker: Optional[str] = None
-        speaker_groups: list[list[SpeechFragment]] = [[]]
-
-        # Group by speakers
-        for frag in fragments:
-            if frag.speaker != current_speaker:
-                current_speaker = frag.speaker
-                if speaker_groups[-1]:
-                    speaker_groups.append([])
-            speaker_groups[-1].append(frag)
+        # Whether to split speaker runs into sentences
+        emit_sentences = session.config.speech_segment_config.emit_sentences
 
-        # Create SpeakerFragments objects
+        # Create SpeakerFragments objects from each run of fragments by the same speaker
         segments: list[SpeakerSegment] = []
-        for group in speaker_groups:
-            # Skip if the group is empty
-            if not group:
-                continue
+        for _, speaker_run in groupby(fragments, key=_FRAGMENT_SPEAKER_KEY):
+            group = list(speaker_run)
 
             # Split group into sub-groups by end-of-sentence markers (finals only)
-            if session.config.speech_segment_config.emit_sentences:
+            if emit_sentences:
                 subgroup: list[SpeechFragment] = []
                 subgroups: list[list[SpeechFragment]] = []
                 for frag in group:
@@ -162,7 +163,7 @@ class FragmentUtils:
     def segment_from_fragments(
         session: ClientSessionInfo,
         fragments: list[SpeechFragment],
-        focus_speakers: Optional[list[str]] = None,
+        focus_speakers: Optional[Collection[str]] = None,
         annotate: bool = True,
     ) -> Optional[SpeakerSegment]:
         """Take a group of fragments and piece together into SpeakerSegment.
@@ -177,51 +178,45 @@ class FragmentUtils:
         Args:
             session: ClientSessionInfo object.
             fragments: List of SpeechFragment objects.
-            focus_speakers: List of speakers to focus on.
+            focus_speakers: Speakers to focus on (ideally a set).
             annotate: Whether to annotate the segment.
 
         Returns:
             The SpeakerSegment object for the group, or None if no valid fragments.
         """
-        # Check for starting fragments that are attached to previous
-        if fragments and fragments[0].attaches_to == "previous":
-            fragments = fragments[1:]
-
-        # Check for trailing fragments that are attached to next
-        if fragments and fragments[-1].attaches_to == "next":
-            fragments = fragments[:-1]
+        # Skip a starting fragment attached to previous and a trailing fragment attached to next
+        lo = 1 if fragments and fragments[0].attaches_to == "previous" else 0
+        hi = len(fragments) - 1 if len(fragments) > lo and fragments[-1].attaches_to == "next" else len(fragments)
 
         # Check there are results
-        if not fragments:
+        if lo >= hi:
             return None
 
+        # Take a single copy, and only when fragments are skipped
+        if lo or hi < len(fragments):
+            fragments = fragments[lo:hi]
+
         # Get the timing extremes
         start_time = min(frag.start_time for frag in fragments)
 
         # Timestamp
-        ts = (session.base_time + datetime.timedelta(seconds=start_time)).isoformat(timespec="milliseconds")
+        ts = _segment_timestamp(session.base_time, start_time)
 
         # Determine if the speaker is considered active
         is_active = True
         if focus_speakers:
             is_active = fragments[0].speaker in focus_speakers
 
-        # New SpeakerSegment
-        segment = SpeakerSegment(
+        # New SpeakerSegment (annotated up front, rather than replacing a default annotation)
+        return SpeakerSegment(
             speaker_id=fragments[0].speaker,
             timestamp=ts,
             language=fragments[0].language,
             fragments=fragments,
             is_active=is_active,
+            annotation=FragmentUtils._annotate_fragments(fragments) if annotate else AnnotationResult(),
         )
 
-        # Annotate
-        if annotate:
-            segment.annotation = FragmentUtils._annotate_segment(segment)
-
-        # Return the SpeakerSegment object
-        return segment
-
     @staticmethod
     def _annotate_segment(segment: SpeakerSegment) -> AnnotationResult:
         """Annotate the segment with any additional information.
@@ -229,6 +224,18 @@ class FragmentUtils:
         Args:
             segment: SpeakerSegment object.
 
+        Returns:
+            AnnotationResult: The annotation result.
+        """
+        return FragmentUtils._annotate_fragments(segment.fragments)
+
+    @staticmethod
+    def _annotate_fragments(fragments: Sequence[SpeechFragment]) -> AnnotationResult:
+        """Annotate the fragments of a segment with any additional information.
+
+        Args:
+            fragments: The (non-empty) fragments of the segment.
+
         Returns:
             AnnotationResult: The annotation result.
         """
@@ -236,27 +243,45 @@ class FragmentUtils:
         result = AnnotationResult()
 
         # References
-        segment_length: int = len(segment.fragments)
-        first_fragment: SpeechFragment = segment.fragments[0]
-        last_fragment: SpeechFragment = segment.fragments[-1]
-        penultimate_fragment: Optional[SpeechFragment] = segment.fragments[-2] if segment_length > 1 else None
+        segment_length: int = len(fragments)
+        first_fragment: SpeechFragment = fragments[0]
+        last_fragment: SpeechFragment = fragments[-1]
+        penultimate_fragment: Optional[SpeechFragment] = fragments[-2] if segment_length > 1 else None
+
+        # Gather the segment details (single pass over the fragments)
+        word_count = 0
+        recent_words: deque[SpeechFragment] = deque(maxlen=10)
+        only_punctuation = True
+        has_partial = False
+        has_final = False
+        has_disfluency = False
+        for frag in fragments:
+            if frag.type_ == "word":
+                word_count += 1
+                recent_words.append(frag)
+            if frag.is_final:
+                has_final = True
+            else:
+                has_partial = True
+            if not frag.is_punctuation:
+                only_punctuation = False
+            if frag.is_disfluency:
+                has_disfluency = True
 
         # Count of words
-        words = [frag for frag in segment.fragments if frag.type_ == "word"]
-        word_count = len(words)
         if word_count == 0:
             result.add(AnnotationFlags.NO_TEXT)
 
         # Only punctuation
-        if all(frag.is_punctuation for frag in segment.fragments):
+        if only_punctuation:
             result.add(AnnotationFlags.ONLY_PUNCTUATION)
 
         # Partials and finals
-        if any(not frag.is_final for frag in segment.fragments):
+        if has_partial:
             result.add(AnnotationFlags.HAS_PARTIAL)
 
         # Finals
-        if any(frag.is_final for frag in segment.fragments):
+        if has_final:
             result.add(AnnotationFlags.HAS_FINAL)
         if first_fragment.is_final:
             result.add(AnnotationFlags.STARTS_WITH_FINAL)
@@ -264,31 +289,28 @@ class FragmentUtils:
             result.add(AnnotationFlags.ENDS_WITH_FINAL)
 
         # End of sentence
-        if last_fragment.is_eos:
+        ends_with_eos = last_fragment.is_eos
+        if ends_with_eos:
             result.add(AnnotationFlags.ENDS_WITH_EOS)
 
         # Punctuation
-        if last_fragment.is_punctuation:
+        ends_with_punctuation = last_fragment.is_punctuation
+        if ends_with_punctuation:
             result.add(AnnotationFlags.ENDS_WITH_PUNCTUATION)
 
         # Disfluency
-        if any(frag.is_disfluency for frag in segment.fragments):
+        if has_disfluency:
             result.add(AnnotationFlags.HAS_DISFLUENCY)
         if first_fragment.is_disfluency:
             result.add(AnnotationFlags.STARTS_WITH_DISFLUENCY)
         if last_fragment.is_disfluency:
             result.add(AnnotationFlags.ENDS_WITH_DISFLUENCY)
-        if (
-            penultimate_fragment
-            and result.any(AnnotationFlags.ENDS_WITH_EOS, AnnotationFlags.ENDS_WITH_PUNCTUATION)
-            and penultimate_fragment.is_disfluency
-        ):
+        if penultimate_fragment and (ends_with_eos or ends_with_punctuation) and penultimate_fragment.is_disfluency:
             result.add(AnnotationFlags.ENDS_WITH_DISFLUENCY)
 
         # Rate of speech
-        if len(words) > 1:
+        if word_count > 1:
             # Calculate the approximate words-per-minute (for last few words)
-            recent_words = words[-10:]
             word_time_span = recent_words[-1].end_time - recent_words[0].start_time
             wpm = (len(recent_words) / word_time_span) * 60
 
@@ -303,6 +325,27 @@ class FragmentUtils:
         # Return the annotation result
         return result
 
+    @staticmethod
+    def _views_unchanged(view1: SpeakerSegmentView, view2: SpeakerSegmentView) -> bool:
+        """Check whether two views hold the same fragments and segment text.
+
+        Fragments are compared by identity, so this is only a cheap pre-check and
+        a `False` result does not mean the views differ. Segment text is included
+        as segments can be updated in place (e.g. a trailing EOS) after creation.
+
+        Args:
+            view1: The first SpeakerSegmentView object.
+            view2: The second SpeakerSegmentView object.
+
+        Returns:
+            bool: True if the views are known to be unchanged.
+        """
+        if len(view1.fragments) != len(view2.fragments) or len(view1.segments) != len(view2.segments):
+            return False
+        if any(f1 is not f2 for f1, f2 in zip(view1.fragments, view2.fragments)):
+            return False
+        return all(s1.text == s2.text for s1, s2 in zip(view1.segments, view2.segments))
+
     @staticmethod
     def compare_views(
         session: ClientSessionInfo, view1: SpeakerSegmentView, view2: Optional[SpeakerSegmentView]
@@ -327,43 +370,45 @@ class FragmentUtils:
 
         # If we have a previous view, compare it
         if view2 and view2.segment_count > 0:
-            # Compare full string
-            view1_full_str: str = view1.format_view_text(include_partials=include_partials)
-            view2_full_str: str = view2.format_view_text(include_partials=include_partials)
-            if view1_full_str != view2_full_str:
-                result.add(AnnotationFlags.UPDATED_FULL)
-            if view1_full_str.lower() != view2_full_str.lower():
-                result.add(AnnotationFlags.UPDATED_FULL_LCASE)
-
-            # Stripped string (without punctuation)
-            view1_stripped_str: str = view1.format_view_text(include_partials=include_partials, words_only=True)
-            view2_stripped_str: str = view2.format_view_text(include_partials=include_partials, words_only=True)
-            if view1_stripped_str != view2_stripped_str:
-                result.add(AnnotationFlags.UPDATED_STRIPPED)
-            if view1_stripped_str.lower() != view2_stripped_str.lower():
-                result.add(AnnotationFlags.UPDATED_STRIPPED_LCASE)
-
-            # Word timings
-            view1_timings_str: str = view1.format_view_text(
-                format="|{start_time}-{end_time}|", words_only=True, include_partials=include_partials
-            )
-            view2_timings_str: str = view2.format_view_text(
-                format="|{start_time}-{end_time}|", words_only=True, include_partials=include_partials
-            )
-            if view1_timings_str != view2_timings_str:
-                result.add(AnnotationFlags.UPDATED_WORD_TIMINGS)
-
-            # Annotations
-            view1_annotation_str: str = view1.format_view_text(format="|{annotation}|")
-            view2_annotation_str: str = view2.format_view_text(format="|{annotation}|")
-            if set(view1_annotation_str) != set(view2_annotation_str):
-                result.add(AnnotationFlags.UPDATED_ANNOTATIONS)
-
-            # Partials, finals and speakers
-            if view1.final_count != view2.final_count:
-                result.add(AnnotationFlags.UPDATED_FINALS)
-            if view1.partial_count != view2.partial_count:
-                result.add(AnnotationFlags.UPDATED_PARTIALS)
+            # Views holding the same fragments and segment text have nothing to diff
+            if not FragmentUtils._views_unchanged(view1, view2):
+                # Compare full string
+                view1_full_str: str = view1.format_view_text(include_partials=include_partials)
+                view2_full_str: str = view2.format_view_text(include_partials=include_partials)
+                if view1_full_str != view2_full_str:
+                    result.add(AnnotationFlags.UPDATED_FULL)
+                    if view1_full_str.lower() != view2_full_str.lower():
+                        result.add(AnnotationFlags.UPDATED_FULL_LCASE)
+
+                # Stripped string (without punctuation)
+                view1_stripped_str: str = view1.format_view_text(include_partials=include_partials, words_only=True)
+                view2_stripped_str: str = view2.format_view_text(include_partials=include_partials, words_only=True)
+                if view1_stripped_str != view2_stripped_str:
+                    result.add(AnnotationFlags.UPDATED_STRIPPED)
+                    if view1_stripped_str.lower() != view2_stripped_str.lower():
+                        result.add(AnnotationFlags.UPDATED_STRIPPED_LCASE)
+
+                # Word timings
+                view1_timings_str: str = view1.format_view_text(
+                    format="|{start_time}-{end_time}|", words_only=True, include_partials=include_partials
+                )
+                view2_timings_str: str = view2.format_view_text(
+                    format="|{start_time}-{end_time}|", words_only=True, include_partials=include_partials
+                )
+                if view1_timings_str != view2_timings_str:
+                    result.add(AnnotationFlags.UPDATED_WORD_TIMINGS)
+
+                # Annotations
+                view1_annotation_str: str = view1.format_view_text(format="|{annotation}|")
+                view2_annotation_str: str = view2.format_view_text(format="|{annotation}|")
+                if set(view1_annotation_str) != set(view2_annotation_str):
+                    result.add(AnnotationFlags.UPDATED_ANNOTATIONS)
+
+                # Partials, finals and speakers
+                if view1.final_count != view2.final_count:
+                    result.add(AnnotationFlags.UPDATED_FINALS)
+                if view1.partial_count != view2.partial_count:
+                    result.add(AnnotationFlags.UPDATED_PARTIALS)
 
         # Assume this is new
         elif view1.segment_count > 0:
@@ -413,7 +458,7 @@ class FragmentUtils:
                     )
 
             # Resort the fragments
-            segment.fragments.sort(key=lambda f: f.idx)
+            segment.fragments.sort(key=_FRAGMENT_IDX_KEY)
 
             # Re-process the text
             FragmentUtils.update_segment_text(session, segment)
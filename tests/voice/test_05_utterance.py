@@ -12,6 +12,7 @@ from _utils import log_client_messages
 from speechmatics.voice import AgentServerMessageType
 from speechmatics.voice import EndOfTurnConfig
 from speechmatics.voice import EndOfUtteranceMode
+from speechmatics.voice import SpeakerFocusConfig
 from speechmatics.voice import SpeechSegmentConfig
 from speechmatics.voice import VoiceAgentConfig
 
@@ -129,6 +130,102 @@ async def test_speech_fragments():
     client._stop_stt_queue()
 
 
+@pytest.mark.asyncio
+async def test_partial_debounce():
+    """Test coalescing of partial segments.
+
+    - send conversation messages (fast) with partial debounce enabled
+    - check partials are coalesced into fewer emissions with the latest text
+    """
+
+    # Test conversation
+    log = ConversationLog(os.path.join(os.path.dirname(__file__), "./assets/chat2.jsonl"))
+    chat = log.get_conversation(
+        ["Info", "RecognitionStarted", "AddPartialTranscript", "AddTranscript", "EndOfUtterance"]
+    )
+
+    # Run the conversation and collect the partial segments
+    async def run(partial_debounce: float) -> list[dict[str, Any]]:
+        client = await get_client(
+            api_key="NONE",
+            connect=False,
+            config=VoiceAgentConfig(speech_segment_config=SpeechSegmentConfig(partial_debounce=partial_debounce)),
+        )
+        client._start_stt_queue()
+
+        # Collect messages
+        messages: list[dict[str, Any]] = []
+        client.on(AgentServerMessageType.ADD_PARTIAL_SEGMENT, messages.append)
+
+        # Inject messages without delay
+        for message in chat[:10]:
+            client.emit(message["payload"]["message"], message["payload"])
+
+        # Wait for processing and debounce window
+        await asyncio.sleep(0.5)
+        client._stop_stt_queue()
+        return messages
+
+    # Without and with debounce
+    immediate = await run(0.0)
+    coalesced = await run(0.2)
+
+    # Check partials are coalesced
+    assert len(immediate) > 1
+    assert 0 < len(coalesced) < len(immediate)
+
+    # Check the latest text is emitted
+    assert coalesced[-1]["segments"][0]["text"] == immediate[-1]["segments"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_speaker_config_edits():
+    """Test edits made to the speaker config after it is constructed.
+
+    - edit focus / ignore speakers on the config before creating the client
+    - check words from the ignored speaker are dropped
+    - edit a new speaker config before passing it to `update_diarization_config`
+    """
+
+    # Edit the config after construction
+    config = VoiceAgentConfig(enable_diarization=True)
+    config.speaker_config.ignore_speakers.append("S2")
+    config.speaker_config.focus_speakers = ["S1"]
+
+    # Create a client
+    client = await get_client(api_key="NONE", connect=False, config=config)
+    assert client._dz_focus_speakers == {"S1"}
+    assert client._dz_ignore_speakers == {"S2"}
+
+    # Final transcript with a single word from a speaker
+    def transcript(speaker: str) -> dict[str, Any]:
+        return {
+            "message": "AddTranscript",
+            "metadata": {"start_time": 0.0, "end_time": 0.5},
+            "results": [
+                {
+                    "type": "word",
+                    "start_time": 0.0,
+                    "end_time": 0.5,
+                    "alternatives": [{"content": "hello", "speaker": speaker, "confidence": 1.0}],
+                }
+            ],
+        }
+
+    # Words from the ignored speaker are dropped
+    await client._add_speech_fragments(transcript("S2"), is_final=True)
+    assert not client._speech_fragments
+    await client._add_speech_fragments(transcript("S1"), is_final=True)
+    assert [frag.speaker for frag in client._speech_fragments] == ["S1"]
+
+    # Update with an edited config
+    speaker_config = SpeakerFocusConfig()
+    speaker_config.ignore_speakers.append("S1")
+    client.update_diarization_config(speaker_config)
+    assert client._dz_focus_speakers == frozenset()
+    assert client._dz_ignore_speakers == {"S1"}
+
+
 @pytest.mark.asyncio
 async def test_end_of_utterance_fixed():
     """Test EndOfUtterance from STT engine.
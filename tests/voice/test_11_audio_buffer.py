@@ -12,6 +12,8 @@ from _utils import get_client
 from _utils import send_audio_file
 from _utils import send_silence
 
+from speechmatics.rt import AsyncClient
+from speechmatics.rt import TransportError
 from speechmatics.voice import AdditionalVocabEntry
 from speechmatics.voice import AgentServerMessageType
 from speechmatics.voice import EndOfTurnConfig
@@ -144,6 +146,105 @@ async def test_buffer_bytes():
     assert len(data) == int((end_time - start_time) * sample_rate / frame_size) * frame_bytes * 2
 
 
+@pytest.mark.asyncio
+async def test_send_coalescing(monkeypatch):
+    """Test coalescing of outgoing audio frames.
+
+    - send small frames with coalescing enabled
+    - check frames are sent once the buffer is full
+    - check a partial buffer is flushed after the coalesce length
+    """
+
+    # Capture frames sent to the transport
+    sent: list[bytes] = []
+
+    async def fake_send_audio(self, payload: bytes) -> None:
+        sent.append(payload)
+
+    monkeypatch.setattr(AsyncClient, "send_audio", fake_send_audio)
+
+    # 100ms of 16kHz / 16-bit audio
+    client = await get_client(
+        api_key="NONE",
+        connect=False,
+        config=VoiceAgentConfig(audio_coalesce_length=0.1),
+    )
+    assert client._send_buffer_size == 3200
+    client._is_ready_for_audio = True
+    client._start_send_buffer_task()
+
+    # Five 20ms frames fill the buffer
+    for i in range(5):
+        await client.send_audio(bytes([i]) * 640)
+    assert len(sent) == 1
+    assert sent[0] == b"".join(bytes([i]) * 640 for i in range(5))
+
+    # A single frame is flushed after the coalesce length
+    await client.send_audio(b"\x09" * 640)
+    assert len(sent) == 1
+    await asyncio.sleep(0.2)
+    assert sent[1] == b"\x09" * 640
+
+    # Stop the task
+    client._stop_send_buffer_task()
+
+
+@pytest.mark.asyncio
+async def test_send_coalescing_stop(monkeypatch):
+    """Test stopping the coalesced audio flush task.
+
+    - stop the task while a timed flush is being sent
+    - check the in-flight payload is still sent, ahead of a later flush
+    - check a transport failure on the timed flush disconnects the client
+    """
+
+    # Capture frames sent to the (slow) transport
+    sent: list[bytes] = []
+
+    async def slow_send_audio(self, payload: bytes) -> None:
+        await asyncio.sleep(0.1)
+        sent.append(payload)
+
+    monkeypatch.setattr(AsyncClient, "send_audio", slow_send_audio)
+
+    # 100ms of 16kHz / 16-bit audio
+    client = await get_client(
+        api_key="NONE",
+        connect=False,
+        config=VoiceAgentConfig(audio_coalesce_length=0.1),
+    )
+    client._is_ready_for_audio = True
+    client._start_send_buffer_task()
+
+    # Stop the task part way through the timed flush, then flush the rest (as disconnect does)
+    await client.send_audio(b"\x01" * 640)
+    await asyncio.sleep(0.15)
+    await client.send_audio(b"\x02" * 640)
+    client._stop_send_buffer_task()
+    await client._flush_send_buffer()
+    assert sent == [b"\x01" * 640, b"\x02" * 640]
+
+    # Transport fails on the timed flush
+    async def failing_send_audio(self, payload: bytes) -> None:
+        raise TransportError("closed")
+
+    monkeypatch.setattr(AsyncClient, "send_audio", failing_send_audio)
+
+    # Track the disconnect
+    disconnected = asyncio.Event()
+
+    async def fake_disconnect() -> None:
+        disconnected.set()
+
+    monkeypatch.setattr(client, "disconnect", fake_disconnect)
+
+    # The timed flush disconnects the client
+    client._start_send_buffer_task()
+    await client.send_audio(b"\x03" * 640)
+    await asyncio.wait_for(disconnected.wait(), timeout=1.0)
+    client._stop_send_buffer_task()
+
+
 @pytest.mark.skipif(os.getenv("CI") == "true", reason="Skipping in CI")
 @pytest.mark.asyncio
 async def test_load_audio_file():